@@ -7,20 +7,69 @@ https://huggingface.co/reddrumm/RVCModels
 
 Usage:
     python download_reddrumm.py
+    python download_reddrumm.py --keep-raw
+
+By default raw_download/ is deleted once the models are organized. With
+--keep-raw it is kept along with the downloaded revision and the list of
+extracted archives, so the next run skips the download when the repository
+hasn't changed and only extracts archives it has not seen before.
 """
 
 import os
+import argparse
+import json
 import shutil
 import re
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from huggingface_hub import snapshot_download
+
+# Use the Rust-based multi-connection downloader when it is installed.
+# Must be set before huggingface_hub is imported, as it reads this at import time.
+try:
+    import hf_transfer  # noqa: F401
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+except ImportError:
+    pass
+
+from huggingface_hub import HfApi, snapshot_download
+
+# Inflate zip members with ISA-L when installed; it is a drop-in zlib
+# replacement that decompresses DEFLATE several times faster.
+try:
+    from isal import isal_zlib
+    zipfile.zlib = isal_zlib
+    zipfile.crc32 = isal_zlib.crc32
+except ImportError:
+    pass
 
 # Configuration
 REPO_ID = "reddrumm/RVCModels"
 BACKEND_DIR = Path(__file__).parent.resolve()
 RAW_DOWNLOAD_DIR = BACKEND_DIR / "raw_download"
 MODELS_DIR = BACKEND_DIR / "models"
+ORGANIZE_WORKERS = 8
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+PROCESSED_ZIPS_FILE = RAW_DOWNLOAD_DIR / ".processed_zips.json"
+DOWNLOAD_SENTINEL = RAW_DOWNLOAD_DIR / ".download_complete"
+# huggingface_hub matches these with fnmatch, which is case-sensitive on POSIX,
+# so each extension is spelled as a case-insensitive character-class pattern
+DOWNLOAD_PATTERNS = [
+    "*." + "".join(f"[{c.lower()}{c.upper()}]" for c in ext)
+    for ext in ("pth", "index", "zip")
+]
+MODEL_EXTENSIONS = ('.pth', '.index')
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Patterns used by sanitize_name(), compiled once at import
+_RE_EXT = re.compile(r'\.(pth|index)$', re.IGNORECASE)
+_RE_VER = re.compile(r'_v\d+$', re.IGNORECASE)
+_RE_RVC = re.compile(r'_(rvc|40k|48k|32k).*$', re.IGNORECASE)
+_RE_SPECIAL = re.compile(r'[^\w\s]')
+_SEP_TO_SPACE = str.maketrans({'_': ' ', '-': ' '})
+
+# Names too generic to identify a character on their own
+GENERIC_NAMES = frozenset({'model', 'weights', 'voice', 'rvc', 'added', 'index'})
 
 def sanitize_name(name: str) -> str:
     """
@@ -28,20 +77,17 @@ def sanitize_name(name: str) -> str:
     Removes special characters and normalizes spacing.
     """
     # Remove file extension if present
-    name = re.sub(r'\.(pth|index)$', '', name, flags=re.IGNORECASE)
+    name = _RE_EXT.sub('', name)
     # Remove common suffixes like _v1, _v2, etc.
-    name = re.sub(r'_v\d+$', '', name, flags=re.IGNORECASE)
+    name = _RE_VER.sub('', name)
     # Remove RVC-related suffixes
-    name = re.sub(r'_(rvc|40k|48k|32k).*$', '', name, flags=re.IGNORECASE)
-    # Replace underscores and hyphens with spaces, then title case
-    name = re.sub(r'[_-]+', ' ', name).strip()
+    name = _RE_RVC.sub('', name)
+    # Replace underscores and hyphens with spaces
+    name = name.translate(_SEP_TO_SPACE)
     # Remove any remaining special characters
-    name = re.sub(r'[^\w\s]', '', name)
-    # Title case and remove extra spaces
-    name = ' '.join(name.split()).title()
-    # Convert back to a safe filename (spaces to underscores)
-    name = name.replace(' ', '_')
-    return name
+    name = _RE_SPECIAL.sub('', name)
+    # Collapse spacing into underscores for a safe filename, then title case
+    return '_'.join(name.split()).title()
 
 
 def extract_character_name(file_path: Path) -> str:
@@ -54,43 +100,189 @@ def extract_character_name(file_path: Path) -> str:
     name = sanitize_name(filename)
     
     # If name is too generic, try parent folder
-    generic_names = ['model', 'weights', 'voice', 'rvc', 'added', 'index']
-    if name.lower() in generic_names or len(name) < 3:
+    if name.lower() in GENERIC_NAMES or len(name) < 3:
         parent_name = file_path.parent.name
         name = sanitize_name(parent_name)
     
     return name if name else "Unknown"
 
 
-def find_matching_index(pth_path: Path) -> Path | None:
+def scan_files(root: Path, suffix: str):
+    """
+    Recursively yield os.DirEntry objects under root whose name ends with suffix.
+    Uses os.scandir, which reuses the directory listing's file type info
+    instead of issuing extra stat() calls per entry like Path.rglob.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(suffix):
+                        yield entry
+        except OSError:
+            continue
+
+
+def build_index_map(index_files: list[Path]) -> dict[Path, list[Path]]:
+    """
+    Map every directory under RAW_DOWNLOAD_DIR to the .index files in its subtree.
+    Built once per run so each .pth lookup is a dictionary probe.
+    """
+    index_map = {}
+    for index_file in index_files:
+        for directory in index_file.parents:
+            index_map.setdefault(directory, []).append(index_file)
+            if directory == RAW_DOWNLOAD_DIR:
+                break
+    return index_map
+
+
+def find_matching_index(pth_path: Path, index_map: dict[Path, list[Path]]) -> Path | None:
     """
     Find a matching .index file for a given .pth file.
-    Looks in the same directory and subdirectories.
+    Looks in the same directory and subdirectories, then the parent directory.
+    An index with exactly the same name wins over a partial name match.
     """
     pth_stem = pth_path.stem.lower()
-    search_dir = pth_path.parent
-    
-    # Search for .index files in the same directory and subdirectories
-    for index_file in search_dir.rglob("*.index"):
-        index_stem = index_file.stem.lower()
-        # Check if the index file matches the pth file
-        if pth_stem in index_stem or index_stem in pth_stem:
-            return index_file
-    
-    # Also check parent directory
-    if search_dir.parent != RAW_DOWNLOAD_DIR:
-        for index_file in search_dir.parent.rglob("*.index"):
+    search_dirs = [pth_path.parent]
+    if pth_path.parent.parent != RAW_DOWNLOAD_DIR:
+        search_dirs.append(pth_path.parent.parent)
+    
+    for search_dir in search_dirs:
+        candidates = index_map.get(search_dir, [])
+        for index_file in candidates:
+            if index_file.stem.lower() == pth_stem:
+                return index_file
+        for index_file in candidates:
             index_stem = index_file.stem.lower()
+            # Check if the index file matches the pth file
             if pth_stem in index_stem or index_stem in pth_stem:
                 return index_file
     
     return None
 
 
-def download_repository():
+def zip_fingerprint(zip_path: Path) -> list[int]:
+    """
+    Identify the exact copy of an archive on disk by its size and mtime,
+    so an archive replaced by a newer download is extracted again.
+    """
+    stat = zip_path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_processed_zips() -> dict:
+    """
+    Load the fingerprints of .zip archives already extracted on a previous run,
+    keyed by archive name.
+    Only meaningful with --keep-raw, since raw_download is otherwise deleted.
+    """
+    try:
+        processed_zips = json.loads(PROCESSED_ZIPS_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+    # Lists written by older versions carry no fingerprint; re-extract everything
+    return processed_zips if isinstance(processed_zips, dict) else {}
+
+
+def save_processed_zips(processed_zips: dict):
+    """
+    Persist the fingerprints of extracted .zip archives so re-runs can skip them.
+    """
+    PROCESSED_ZIPS_FILE.write_text(json.dumps(processed_zips, sort_keys=True))
+
+
+def extract_models_from_zip(zip_path: Path, dest_dir: Path) -> int:
+    """
+    Extract only the .pth and .index members of a .zip archive, replacing any
+    existing copies. Members are stream-decompressed to disk so they are never
+    held in memory.
+    Returns the number of files extracted.
+    """
+    dest_root = dest_dir.resolve()
+    extracted = 0
+    
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(MODEL_EXTENSIONS):
+                continue
+            
+            target = (dest_dir / info.filename).resolve()
+            # Refuse members that would escape the destination directory
+            if dest_root not in target.parents:
+                continue
+            
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a sibling and move it into place, so a failed member
+            # never leaves a truncated file at the final path
+            partial = target.with_name(target.name + '.part')
+            try:
+                with zip_ref.open(info) as src, open(partial, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                os.replace(partial, target)
+            except BaseException:
+                partial.unlink(missing_ok=True)
+                raise
+            extracted += 1
+    
+    return extracted
+
+
+def extract_archive(zip_path: Path) -> tuple[Path, int | None]:
+    """
+    Extract one archive into its own folder under RAW_DOWNLOAD_DIR, so parallel
+    extractions never write to the same paths. The folder is cleared first so
+    members dropped from a newer copy of the archive don't linger.
+    Returns (zip_path, file count), with a count of None if extraction failed.
+    """
+    dest_dir = RAW_DOWNLOAD_DIR / zip_path.stem
+    try:
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        return zip_path, extract_models_from_zip(zip_path, dest_dir)
+    except Exception as e:
+        print(f"      ⚠️ Error extracting {zip_path.name}: {e}")
+        return zip_path, None
+
+
+def link_or_copy(src: Path, dst: Path):
     """
-    Download the entire reddrumm/RVCModels repository.
+    Place src at dst without copying bytes when possible.
+    Hardlinks when both paths are on the same filesystem, since raw_download
+    is removed afterwards anyway; falls back to a regular copy otherwise.
     """
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def get_remote_revision() -> str | None:
+    """
+    Get the latest commit SHA of the repository, or None if it can't be fetched.
+    """
+    try:
+        return HfApi().model_info(REPO_ID).sha
+    except Exception as e:
+        print(f"   ⚠️ Could not check repository revision: {e}")
+        return None
+
+
+def download_repository(keep_raw: bool = False):
+    """
+    Download the model files of the reddrumm/RVCModels repository.
+    With keep_raw, the downloaded revision is recorded and the download is
+    skipped when raw_download from a previous run already holds it.
+    """
+    revision = get_remote_revision() if keep_raw else None
+    if revision and DOWNLOAD_SENTINEL.exists() and DOWNLOAD_SENTINEL.read_text().strip() == revision:
+        print(f"✅ Repository already downloaded at revision {revision[:8]}, skipping")
+        return True
+    
     print(f"📥 Downloading repository: {REPO_ID}")
     print(f"   This may take a while depending on your connection...")
     print()
@@ -100,8 +292,12 @@ def download_repository():
             repo_id=REPO_ID,
             local_dir=str(RAW_DOWNLOAD_DIR),
             repo_type="model",
-            ignore_patterns=["*.md", "*.txt", "*.json", ".gitattributes"],
+            revision=revision,
+            allow_patterns=DOWNLOAD_PATTERNS,
+            etag_timeout=10,
         )
+        if revision:
+            DOWNLOAD_SENTINEL.write_text(revision)
         print(f"✅ Download complete!")
         return True
     except Exception as e:
@@ -109,10 +305,39 @@ def download_repository():
         return False
 
 
-def organize_models():
+def process_model(pth_path: Path, char_name: str, index_map: dict[Path, list[Path]]) -> str | None:
+    """
+    Place a single .pth file and its matching .index file into MODELS_DIR.
+    Returns the character name, or None if the model could not be processed.
+    """
+    try:
+        # Define target paths
+        target_pth = MODELS_DIR / f"{char_name}.pth"
+        
+        # Link (or copy) the .pth file
+        link_or_copy(pth_path, target_pth)
+        message = f"   📦 Processing: {char_name}"
+        
+        # Look for matching .index file
+        index_path = find_matching_index(pth_path, index_map)
+        if index_path:
+            target_index = MODELS_DIR / f"{char_name}.index"
+            link_or_copy(index_path, target_index)
+            message += "\n      ✓ Found matching .index file"
+        
+        print(message)
+        return char_name
+        
+    except Exception as e:
+        print(f"   ⚠️ Error processing {pth_path.name}: {e}")
+        return None
+
+
+def organize_models(keep_raw: bool = False):
     """
     Scan the downloaded repository and organize models into the clean structure.
     Handles both .pth files and .zip archives containing .pth files.
+    With keep_raw, archives extracted by a previous run are not extracted again.
     """
     print()
     print("🔍 Scanning for voice models...")
@@ -128,22 +353,26 @@ def organize_models():
     
     # Track what we've processed to avoid duplicates
     processed_names = set()
-    models_found = []
     
-    # First, extract any .zip files
-    zip_files = list(RAW_DOWNLOAD_DIR.glob("*.zip"))
+    # First, extract the model files from any .zip archives not handled yet
+    processed_zips = load_processed_zips() if keep_raw else {}
+    zip_files = [
+        p for p in RAW_DOWNLOAD_DIR.iterdir()
+        if p.suffix.lower() == '.zip' and processed_zips.get(p.name) != zip_fingerprint(p)
+    ]
     if zip_files:
         print(f"   Found {len(zip_files)} .zip archives to extract...")
-        for zip_path in zip_files:
-            try:
-                print(f"   📦 Extracting: {zip_path.name}")
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(RAW_DOWNLOAD_DIR)
-            except Exception as e:
-                print(f"      ⚠️ Error extracting {zip_path.name}: {e}")
+        # Inflation releases the GIL, so archives extract in parallel on threads
+        with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as executor:
+            for zip_path, count in executor.map(extract_archive, zip_files):
+                if count is not None:
+                    print(f"   📦 Extracted {count} model files from {zip_path.name}")
+                    processed_zips[zip_path.name] = zip_fingerprint(zip_path)
+        if keep_raw:
+            save_processed_zips(processed_zips)
     
     # Find all .pth files (including ones just extracted)
-    pth_files = list(RAW_DOWNLOAD_DIR.rglob("*.pth"))
+    pth_files = [Path(e.path) for e in scan_files(RAW_DOWNLOAD_DIR, '.pth')]
     print(f"   Found {len(pth_files)} .pth files")
     
     if len(pth_files) == 0:
@@ -157,38 +386,29 @@ def organize_models():
         return []
     print()
     
+    # Scan for .index files once rather than re-walking the tree per .pth
+    index_files = [Path(e.path) for e in scan_files(RAW_DOWNLOAD_DIR, '.index')]
+    index_map = build_index_map(index_files)
+    
+    # Assign unique names up front so the workers never race on them
+    jobs = []
     for pth_path in pth_files:
-        try:
-            # Extract character name
-            char_name = extract_character_name(pth_path)
-            
-            # Handle duplicates by adding a suffix
-            original_name = char_name
-            counter = 1
-            while char_name in processed_names:
-                counter += 1
-                char_name = f"{original_name}_{counter}"
-            
-            processed_names.add(char_name)
-            
-            # Define target paths
-            target_pth = MODELS_DIR / f"{char_name}.pth"
-            
-            # Copy the .pth file
-            print(f"   📦 Processing: {char_name}")
-            shutil.copy2(pth_path, target_pth)
-            
-            # Look for matching .index file
-            index_path = find_matching_index(pth_path)
-            if index_path:
-                target_index = MODELS_DIR / f"{char_name}.index"
-                shutil.copy2(index_path, target_index)
-                print(f"      ✓ Found matching .index file")
-            
-            models_found.append(char_name)
-            
-        except Exception as e:
-            print(f"   ⚠️ Error processing {pth_path.name}: {e}")
+        # Extract character name
+        char_name = extract_character_name(pth_path)
+        
+        # Handle duplicates by adding a suffix
+        original_name = char_name
+        counter = 1
+        while char_name in processed_names:
+            counter += 1
+            char_name = f"{original_name}_{counter}"
+        
+        processed_names.add(char_name)
+        jobs.append((pth_path, char_name))
+    
+    with ThreadPoolExecutor(max_workers=ORGANIZE_WORKERS) as executor:
+        results = executor.map(lambda job: process_model(*job, index_map), jobs)
+        models_found = [name for name in results if name]
     
     return models_found
 
@@ -208,6 +428,14 @@ def cleanup_raw_download():
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Download and organize RVC voice models.")
+    parser.add_argument(
+        "--keep-raw",
+        action="store_true",
+        help="keep raw_download/ so re-runs can skip the download and zip extraction",
+    )
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("  Anime Voice Model Downloader")
     print("  Source: reddrumm/RVCModels (Hugging Face)")
@@ -215,15 +443,16 @@ def main():
     print()
     
     # Step 1: Download
-    if not download_repository():
+    if not download_repository(keep_raw=args.keep_raw):
         print("Aborting due to download failure.")
         return
     
     # Step 2: Organize
-    models = organize_models()
+    models = organize_models(keep_raw=args.keep_raw)
     
     # Step 3: Cleanup
-    cleanup_raw_download()
+    if not args.keep_raw:
+        cleanup_raw_download()
     
     # Summary
     print()
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
-import os,uuid,asyncio,subprocess,sys,json,base64
+import os,uuid,asyncio,json,struct,time,logging
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from fastapi import FastAPI,HTTPException,BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import edge_tts
 
@@ -16,8 +18,16 @@ TEMP_DIR=BACKEND_DIR/"temp"
 MODELS_DIR.mkdir(exist_ok=True)
 TEMP_DIR.mkdir(exist_ok=True)
 WHISPER_MODEL=None
+RVC_MODEL=None
+RVC_LOADED=None
+RVC_LOCK=asyncio.Lock()
 
 DEFAULT_TTS_VOICE="en-US-AriaNeural"
+log=logging.getLogger("uvicorn.error")
+VOICE_CACHE_TTL=5
+STREAM_CHUNK_SIZE=64*1024
+TTS_CACHE_SIZE=32
+TTS_CACHE=OrderedDict()
 
 app=FastAPI(
     title="Anime Voice Reader API",
@@ -38,59 +48,113 @@ class SpeakRequest(BaseModel):
     character:str
     speed:Optional[float]=1.0
 
-class VoiceInfo(BaseModel):
-    name:str
-    has_index:bool
-
 def cleanup(*paths):
     for p in paths:
+        if not p: continue
         try:
-            if p and p.exists(): p.unlink()
-        except Exception:
+            os.unlink(p)
+        except OSError:
             pass
 
+@lru_cache(maxsize=1)
+def _scan_models(bucket):
+    # one directory listing, no per-voice stat(); bucket changes every VOICE_CACHE_TTL seconds
+    files={}
+    with os.scandir(MODELS_DIR) as it:
+        for e in it:
+            stem,_,ext=e.name.rpartition(".")
+            if ext in ("pth","index"):
+                files.setdefault(stem,set()).add(ext)
+    # sorted and serialized once per scan, /voices returns these dicts as-is
+    return {k:{"name":k,"has_index":"index" in v} for k,v in sorted(files.items()) if "pth" in v}
+
 def get_available_voices():
-    out=[]
-    for pth in MODELS_DIR.glob("*.pth"):
-        out.append(VoiceInfo(
-            name=pth.stem,
-            has_index=(MODELS_DIR/f"{pth.stem}.index").exists()
-        ))
-    return sorted(out,key=lambda v:v.name)
+    return _scan_models(int(time.monotonic())//VOICE_CACHE_TTL)
 
 async def tts_with_timings(text,out,speed):
+    # edge-tts opens a fresh websocket per synthesis, so repeated text (e.g. previews) is served from memory
+    key=(text,speed)
+    if key in TTS_CACHE:
+        TTS_CACHE.move_to_end(key)
+        audio,timings=TTS_CACHE[key]
+        with open(out,"wb") as f:
+            f.write(audio)
+        return timings
     if speed==1.0:
         c=edge_tts.Communicate(text,DEFAULT_TTS_VOICE)
     else:
         c=edge_tts.Communicate(text,DEFAULT_TTS_VOICE,rate=f"{int((speed-1)*100):+d}%")
     timings=[]
-    async for chunk in c.stream():
-        if chunk["type"]=="audio":
-            with open(out,"ab") as f:
+    audio=[]
+    with open(out,"wb") as f:
+        async for chunk in c.stream():
+            if chunk["type"]=="audio":
                 f.write(chunk["data"])
-        elif chunk["type"]=="WordBoundary":
-            timings.append({
-                "word":chunk["text"],
-                "start":chunk["offset"]/1e7,
-                "end":(chunk["offset"]+chunk["duration"])/1e7
-            })
+                audio.append(chunk["data"])
+            elif chunk["type"]=="WordBoundary":
+                timings.append({
+                    "word":chunk["text"],
+                    "start":chunk["offset"]/1e7,
+                    "end":(chunk["offset"]+chunk["duration"])/1e7
+                })
+    if audio:
+        TTS_CACHE[key]=(b"".join(audio),timings)
+        if len(TTS_CACHE)>TTS_CACHE_SIZE: TTS_CACHE.popitem(last=False)
     return timings
 
-def rvc_convert(inp,out,character):
-    pth=MODELS_DIR/f"{character}.pth"
-    idx=MODELS_DIR/f"{character}.index"
-    if not pth.exists():
+def get_rvc():
+    global RVC_MODEL
+    if RVC_MODEL is None:
+        from rvc_python.infer import RVCInference
+        RVC_MODEL=RVCInference(device="cuda:0")
+        # same values the `rvc_python cli` invocation used (its argparse defaults + -me harvest)
+        RVC_MODEL.set_params(
+            f0method="harvest",
+            f0up_key=0,
+            index_rate=0.6,
+            filter_radius=3,
+            resample_sr=0,
+            rms_mix_rate=0.25,
+            protect=0.5
+        )
+    return RVC_MODEL
+
+def file_identity(path):
+    st=os.stat(path)
+    return (st.st_ino,st.st_mtime_ns)
+
+def rvc_infer(inp,out,voice):
+    # keeps torch/CUDA and the last used voice resident between requests;
+    # reloads when the voice's files were replaced or an index was added/removed
+    global RVC_LOADED
+    rvc=get_rvc()
+    pth=MODELS_DIR/f"{voice['name']}.pth"
+    idx=MODELS_DIR/f"{voice['name']}.index" if voice["has_index"] else None
+    key=(voice["name"],file_identity(pth),idx and file_identity(idx))
+    if RVC_LOADED!=key:
+        RVC_LOADED=None
+        rvc.load_model(str(pth),index_path=str(idx) if idx else "")
+        RVC_LOADED=key
+    rvc.infer_file(str(inp),str(out))
+
+async def rvc_convert(inp,out,character):
+    voice=get_available_voices().get(character)
+    if voice is None:
         raise HTTPException(404,f"Voice model not found: {character}")
-    cmd=[
-        sys.executable,"-m","rvc_python","cli",
-        "-mp",str(pth),
-        "-i",str(inp),
-        "-o",str(out),
-        "-me","harvest",
-        "-de","cuda"
-    ]
-    if idx.exists(): cmd+=["-ip",str(idx)]
-    subprocess.run(cmd,check=True)
+    async with RVC_LOCK:
+        try:
+            await asyncio.to_thread(rvc_infer,inp,out,voice)
+        except Exception:
+            log.exception("RVC conversion failed for %s",character)
+            raise HTTPException(500,"RVC conversion failed")
+
+def speech_body(timings,wav_path):
+    # <uint32 LE timings length><timings JSON><raw audio bytes>
+    meta=json.dumps(timings).encode("utf-8")
+    yield struct.pack("<I",len(meta))+meta
+    with open(wav_path,"rb") as f:
+        while chunk:=f.read(STREAM_CHUNK_SIZE):
+            yield chunk
 
 def timings_with_whisper(wav_path:Path):
     try:
@@ -123,7 +187,7 @@ async def root():
 @app.get("/voices")
 async def voices():
     v=get_available_voices()
-    return {"voices":[i.model_dump() for i in v],"count":len(v)}
+    return {"voices":list(v.values()),"count":len(v)}
 
 @app.post("/speak")
 async def speak(req:SpeakRequest,background:BackgroundTasks):
@@ -137,31 +201,28 @@ async def speak(req:SpeakRequest,background:BackgroundTasks):
     try:
         # Get TTS audio and word timings
         timings=await tts_with_timings(req.text,base,req.speed or 1.0)
-        rvc_convert(base,out,req.character)
+        await rvc_convert(base,out,req.character)
         if not out.exists():
             raise HTTPException(500,"Audio generation failed")
 
         if not timings:
             try:
-                timings = timings_with_whisper(out)
-            except Exception as e:
+                # shares the GPU lock with RVC, which also covers the lazy Whisper load
+                async with RVC_LOCK:
+                    timings = await asyncio.to_thread(timings_with_whisper,out)
+            except Exception:
                 timings = []
 
-        # Read audio file and convert to base64
-        with open(out,"rb") as f:
-            audio_data=f.read()
-        audio_b64=base64.b64encode(audio_data).decode('utf-8')
-        
         background.add_task(cleanup,base,out)
         
-        # Return audio and timings together
-        return JSONResponse({
-            "audio":audio_b64,
-            "timings":timings
-        })
-    except subprocess.CalledProcessError as e:
+        # Return timings and raw audio together in one binary body
+        return StreamingResponse(
+            speech_body(timings,out),
+            media_type="application/octet-stream"
+        )
+    except Exception:
         cleanup(base,out)
-        raise HTTPException(500,"RVC conversion failed")
+        raise
 
 @app.get("/voices/{character}/preview")
 async def preview(character:str,background:BackgroundTasks):
@@ -175,14 +236,21 @@ async def preview(character:str,background:BackgroundTasks):
 
 @app.on_event("startup")
 async def startup():
-    for f in TEMP_DIR.glob("*"):
-        try:f.unlink()
-        except Exception:pass
+    with os.scandir(TEMP_DIR) as it:
+        for e in it:
+            try:os.unlink(e.path)
+            except OSError:pass
+    _scan_models.cache_clear()
+    try:
+        await asyncio.to_thread(get_rvc)
+    except Exception as e:
+        # /speak retries the lazy load; keep / and /voices up meanwhile
+        print(f"⚠️ RVC warm-up failed, loading on first request instead: {e}")
     v=get_available_voices()
     print("\n🎭 Anime Voice Reader Server Starting...")
     print(f"📁 Models: {MODELS_DIR}")
     print(f"🎤 Voices: {len(v)}")
-    for i in v[:10]: print(f" • {i.name}")
+    for name in list(v)[:10]: print(f" • {name}")
     print()
 
 if __name__=="__main__":
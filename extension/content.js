@@ -620,6 +620,16 @@ function startHighlightLoop(audio, timings, timingMap) {
   animationFrameId = requestAnimationFrame(updateHighlight);
 }
 
+function parseSpeechResponse(buffer) {
+  // Body layout: <uint32 LE timings length><timings JSON><audio bytes>
+  const metaLength = new DataView(buffer).getUint32(0, true);
+  const meta = new TextDecoder().decode(new Uint8Array(buffer, 4, metaLength));
+  return {
+    timings: JSON.parse(meta),
+    audio: new Uint8Array(buffer, 4 + metaLength),
+  };
+}
+
 async function getSelectedVoice() {
   const stored = await chrome.storage.local.get(["selectedVoice"]);
   if (stored.selectedVoice) return stored.selectedVoice;
@@ -660,8 +670,8 @@ async function speakSelection(selection) {
     });
 
     if (!res.ok) throw new Error();
-    const data = await res.json();
-    if (!data?.audio) throw new Error();
+    const data = parseSpeechResponse(await res.arrayBuffer());
+    if (!data.audio.length) throw new Error();
 
     currentTimings = data.timings || [];
     wordSpans = wrapWordsInSpans(selection.range);
@@ -672,10 +682,7 @@ async function speakSelection(selection) {
     }
 
     const timingMap = buildTimingMap(currentTimings, wordSpans);
-    const audioBytes = Uint8Array.from(atob(data.audio), (c) =>
-      c.charCodeAt(0)
-    );
-    const blob = new Blob([audioBytes], { type: "audio/wav" });
+    const blob = new Blob([data.audio], { type: "audio/wav" });
     const url = URL.createObjectURL(blob);
 
     const audio = new Audio(url);
@@ -141,6 +141,16 @@ async function saveVoiceImages() {
   await chrome.storage.local.set({ voiceImages });
 }
 
+function parseSpeechResponse(buffer) {
+  // Body layout: <uint32 LE timings length><timings JSON><audio bytes>
+  const metaLength = new DataView(buffer).getUint32(0, true);
+  const meta = new TextDecoder().decode(new Uint8Array(buffer, 4, metaLength));
+  return {
+    timings: JSON.parse(meta),
+    audio: new Uint8Array(buffer, 4 + metaLength),
+  };
+}
+
 async function speakText(text) {
   if (!text.trim()) {
     setStatus("No text");
@@ -168,13 +178,10 @@ async function speakText(text) {
       const errText = await res.text();
       throw new Error(errText || "TTS failed");
     }
-    const data = await res.json();
-    if (!data.audio) throw new Error("No audio");
+    const data = parseSpeechResponse(await res.arrayBuffer());
+    if (!data.audio.length) throw new Error("No audio");
 
-    const audioBytes = Uint8Array.from(atob(data.audio), (c) =>
-      c.charCodeAt(0)
-    );
-    const blob = new Blob([audioBytes], { type: "audio/wav" });
+    const blob = new Blob([data.audio], { type: "audio/wav" });
     const url = URL.createObjectURL(blob);
     audioEl.src = url;
     await audioEl.play();